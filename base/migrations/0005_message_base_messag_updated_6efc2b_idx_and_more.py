@@ -0,0 +1,21 @@
+# Generated by Django 5.2.17 on 2026-08-28 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['-updated', '-created'], name='base_messag_updated_6efc2b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['-updated', '-created'], name='base_room_updated_3415ed_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.17 on 2026-08-28 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0005_message_base_messag_updated_6efc2b_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['room', '-created'], name='base_messag_room_id_cd245e_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.17 on 2026-08-28 07:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_message_base_messag_room_id_cd245e_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='message',
+            options={'base_manager_name': 'objects', 'ordering': ['-updated', '-created']},
+        ),
+    ]
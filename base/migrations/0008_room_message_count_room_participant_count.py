@@ -0,0 +1,39 @@
+# Generated by Django 5.2.17 on 2026-08-28 07:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counts(apps, schema_editor):
+    """Populate the new counters from the existing related rows."""
+    Room = apps.get_model('base', 'Room')
+    rooms = Room.objects.annotate(
+        pc=Count('participants', distinct=True),
+        mc=Count('message', distinct=True),
+    )
+    for room in rooms.iterator():
+        Room.objects.filter(pk=room.pk).update(
+            participant_count=room.pc,
+            message_count=room.mc,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0007_alter_message_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='participant_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
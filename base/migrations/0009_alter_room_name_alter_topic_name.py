@@ -0,0 +1,23 @@
+# Generated by Django 5.2.17 on 2026-08-28 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0008_room_message_count_room_participant_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='room',
+            name='name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='topic',
+            name='name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.17 on 2026-08-28 07:32
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0009_alter_room_name_alter_topic_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.FileField(default='avatar.svg', null=True, upload_to='avatars/', validators=[django.core.validators.FileExtensionValidator(['svg', 'png', 'jpg', 'jpeg'])]),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.17 on 2026-08-28 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0010_alter_user_avatar'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='room',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='participant_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+    ]
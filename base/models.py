@@ -1,7 +1,22 @@
-from django.db import models
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.validators import FileExtensionValidator
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-import os # Import the os module for file system operations
-from django.conf import settings # Import settings to access MEDIA_ROOT
+
+logger = logging.getLogger(__name__)
+
+def _delete_avatar_file(storage, name):
+    """Remove an avatar file, tolerating storage errors."""
+    try:
+        storage.delete(name)
+    except OSError as e:
+        logger.warning("Error deleting avatar file %s: %s", name, e)
 
 class UserManager(BaseUserManager):
     """Define a model manager for User model with no username field."""
@@ -33,76 +48,186 @@ class UserManager(BaseUserManager):
 
         return self._create_user(email, password, **extra_fields)
 
+    def bulk_create_users(self, rows, batch_size=500):
+        """Create many users from dicts of field values in a few queries.
+
+        Each row needs an 'email' key and may carry 'password' plus any
+        other User fields. Emails are normalized up front, the password
+        hashes (the compute-bound part) are computed in parallel across
+        CPU cores, and the instances are inserted with bulk_create -
+        bypassing the per-instance save() and its avatar handling, which
+        a fresh user doesn't need.
+        """
+        rows = list(rows)
+        with ProcessPoolExecutor() as executor:
+            hashes = list(executor.map(make_password, [row.get('password') for row in rows]))
+        users = []
+        for row, password_hash in zip(rows, hashes):
+            extra = {k: v for k, v in row.items() if k not in ('email', 'password')}
+            extra.setdefault('is_staff', False)
+            extra.setdefault('is_superuser', False)
+            users.append(self.model(
+                email=self.normalize_email(row['email']),
+                password=password_hash,
+                **extra,
+            ))
+        return self.bulk_create(users, batch_size=batch_size, ignore_conflicts=True)
+
+    def bulk_delete_with_avatars(self, queryset=None):
+        """Delete the given users and remove their avatar files in parallel.
+
+        QuerySet.delete() bypasses the per-instance delete() override, so
+        bulk purges (e.g. admin actions) would otherwise leak avatar files.
+        The deletions are fanned out over a thread pool so many small
+        storage calls don't run serially.
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        avatar_names = list(
+            queryset.exclude(avatar__isnull=True)
+                    .exclude(avatar='')
+                    .exclude(avatar=self.model.DEFAULT_AVATAR)
+                    .values_list('avatar', flat=True)
+        )
+        result = queryset.delete()
+        if avatar_names:
+            storage = self.model._meta.get_field('avatar').storage
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                executor.map(lambda name: _delete_avatar_file(storage, name), avatar_names)
+        return result
+
 class User(AbstractUser):
+    DEFAULT_AVATAR = 'avatar.svg'
+
     name = models.CharField(max_length=200, null=True)
     email = models.EmailField(unique=True, null=True)
     bio = models.TextField(null=True)
 
-    avatar = models.ImageField(null=True, default="avatar.svg")
+    # FileField rather than ImageField: no width/height fields are used,
+    # the default avatar is an SVG (which Pillow doesn't handle anyway),
+    # and FileField keeps Pillow out of the import path entirely.
+    avatar = models.FileField(
+        null=True,
+        default=DEFAULT_AVATAR,
+        upload_to='avatars/',
+        validators=[FileExtensionValidator(['svg', 'png', 'jpg', 'jpeg'])],
+    )
 
     USERNAME_FIELD =  'email'
     REQUIRED_FIELDS = ['username']
 
     objects = UserManager()
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._capture_loaded_avatar()
+
+    def _capture_loaded_avatar(self):
+        # Remember the avatar as it was loaded so save() can detect a
+        # change without re-querying. Going through __dict__ avoids
+        # triggering a load when the field was deferred.
+        avatar = self.__dict__.get('avatar')
+        self._loaded_avatar = str(avatar) if avatar else None
+        self._loaded_avatar_known = 'avatar' in self.__dict__
+
     def save(self, *args, **kwargs):
         # This method is called when a User instance is saved (created or updated).
         # We want to delete the old avatar file if the avatar is being changed.
+        # Callers that pass update_fields (e.g. update_fields=['bio']) skip
+        # the old-avatar lookup entirely when the avatar is not being touched.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'avatar' not in update_fields:
+            return super().save(*args, **kwargs)
+        replaced_name = None
         if self.pk: # Check if the instance already exists in the database (i.e., it's an update)
-            try:
-                # Retrieve the old instance from the database to compare its avatar
-                old_instance = User.objects.get(pk=self.pk)
-                # Check if the avatar has changed AND if the old avatar was not the default 'avatar.svg'
-                if old_instance.avatar and old_instance.avatar.name != self.avatar.name and old_instance.avatar.name != 'avatar.svg':
-                    # Construct the full path to the old avatar file
-                    old_avatar_path = os.path.join(settings.MEDIA_ROOT, old_instance.avatar.name)
-                    # Delete the old avatar file if it exists on the filesystem
-                    if os.path.exists(old_avatar_path):
-                        try:
-                            os.remove(old_avatar_path)
-                        except OSError as e:
-                            # Log the error, but don't prevent the new avatar from being saved
-                            print(f"Error deleting old avatar file {old_avatar_path}: {e}")
-            except User.DoesNotExist:
-                # This case should ideally not happen if self.pk exists, but good for robustness
-                pass
+            # Use the avatar captured at load time when we have it; only
+            # fall back to a narrow single-column query when the field was
+            # deferred on load.
+            if self._loaded_avatar_known:
+                old_name = self._loaded_avatar
+            else:
+                old_name = type(self).objects.filter(pk=self.pk).values_list('avatar', flat=True).first()
+            # Check if the avatar has changed AND if the old avatar was not the default
+            if old_name and old_name != self.avatar.name and old_name != self.DEFAULT_AVATAR:
+                replaced_name = old_name
         super().save(*args, **kwargs) # Call the original save method
+        if replaced_name:
+            # Only now that the row is written, queue the file deletion for
+            # when the transaction commits. In autocommit mode on_commit
+            # runs the callback immediately, so registering it before the
+            # save would unlink the file ahead of the DB write; inside an
+            # atomic() block it still runs only if the transaction commits.
+            transaction.on_commit(
+                lambda storage=self.avatar.storage, name=replaced_name: _delete_avatar_file(storage, name)
+            )
+        # The value just written is now the loaded one for later saves.
+        self._capture_loaded_avatar()
 
     def delete(self, *args, **kwargs):
         # This method is called when a User instance is deleted.
         # We want to delete the associated avatar file, unless it's the default.
-        if self.avatar and self.avatar.name != 'avatar.svg':
-            avatar_path = os.path.join(settings.MEDIA_ROOT, self.avatar.name)
-            if os.path.exists(avatar_path):
-                try:
-                    os.remove(avatar_path)
-                except OSError as e:
-                    print(f"Error deleting avatar file {avatar_path} during user deletion: {e}")
-        super().delete(*args, **kwargs) # Call the original delete method
+        # Grab the name and storage first; the callback is registered only
+        # after the row deletion succeeds (see save() for why).
+        doomed_name = self.avatar.name if self.avatar else None
+        storage = self.avatar.storage if doomed_name else None
+        result = super().delete(*args, **kwargs) # Call the original delete method
+        if doomed_name and doomed_name != self.DEFAULT_AVATAR:
+            transaction.on_commit(
+                lambda storage=storage, name=doomed_name: _delete_avatar_file(storage, name)
+            )
+        return result
 
 # Create your models here.
 
 class Topic(models.Model):
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
 
     def __str__(self):
         return self.name
 
+class RoomManager(models.Manager):
+    """Manager that always joins host and topic.
+
+    Templates touch room.host and room.topic on every rendered row, so
+    fetching them up front turns an N+1 query pattern into one query.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('host', 'topic')
+
+class MessageManager(models.Manager):
+    """Manager that always joins the message author (and room)."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('user', 'room')
+
 class Room(models.Model):
     host = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     topic = models.ForeignKey(Topic, on_delete=models.SET_NULL, null=True)
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
     description = models.TextField(null=True, blank=True)
     participants = models.ManyToManyField(User, related_name='participants', blank=True)
+    # Denormalized counters kept in sync by the signal receivers below,
+    # so templates don't issue a COUNT(*) per rendered room. Not editable:
+    # forms and the admin must not overwrite the maintained values.
+    participant_count = models.PositiveIntegerField(default=0, db_index=True, editable=False)
+    message_count = models.PositiveIntegerField(default=0, editable=False)
     updated = models.DateTimeField(auto_now=True)
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = RoomManager()
+
     class Meta:
         ordering = ['-updated', '-created']
+        # Composite index so the default ordering is served by an index
+        # scan instead of a filesort.
+        indexes = [
+            models.Index(fields=['-updated', '-created']),
+        ]
 
     def __str__(self):
         return self.name
-    
+
 class Message(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     room = models.ForeignKey(Room, on_delete=models.CASCADE)
@@ -110,8 +235,70 @@ class Message(models.Model):
     updated = models.DateTimeField(auto_now=True)
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = MessageManager()
+
     class Meta:
         ordering = ['-updated', '-created']
+        # Related accesses (room.message_set, user.message_set) should use
+        # the joining manager too - the chat view renders message.user for
+        # every message.
+        base_manager_name = 'objects'
+        indexes = [
+            models.Index(fields=['-updated', '-created']),
+            # Serves the per-room chat history query (room.message_set
+            # ordered newest-first) directly.
+            models.Index(fields=['room', '-created']),
+        ]
 
     def __str__(self):
-        return self.body[0:50]
\ No newline at end of file
+        return self.body[0:50]
+
+def _recompute_participant_counts(room_pks):
+    """Set participant_count from the through table for the given rooms."""
+    if not room_pks:
+        return
+    through = Room.participants.through
+    counts = (
+        through.objects.filter(room_id=models.OuterRef('pk'))
+        .order_by()
+        .values('room_id')
+        .annotate(total=models.Count('pk'))
+        .values('total')
+    )
+    Room.objects.filter(pk__in=room_pks).update(
+        participant_count=Coalesce(models.Subquery(counts), 0)
+    )
+
+@receiver(m2m_changed, sender=Room.participants.through)
+def update_participant_count(sender, instance, action, reverse, pk_set, **kwargs):
+    # Recompute from the through table instead of applying deltas: pk_set
+    # may name pks that were never linked (remove() sends them anyway),
+    # and on the reverse path it holds Room pks, where each room changes
+    # by one user, not by len(pk_set).
+    if action == 'pre_clear' and reverse:
+        # pk_set is None for clear, so capture the affected rooms while
+        # the through rows still exist.
+        instance._cleared_room_pks = list(instance.participants.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        room_pks = [instance.pk]
+    elif action == 'post_clear':
+        room_pks = instance.__dict__.pop('_cleared_room_pks', [])
+    else:
+        room_pks = pk_set or []
+    _recompute_participant_counts(room_pks)
+
+@receiver(post_save, sender=Message)
+def increment_message_count(sender, instance, created, **kwargs):
+    if created:
+        Room.objects.filter(pk=instance.room_id).update(
+            message_count=models.F('message_count') + 1
+        )
+
+@receiver(post_delete, sender=Message)
+def decrement_message_count(sender, instance, **kwargs):
+    Room.objects.filter(pk=instance.room_id).update(
+        message_count=models.F('message_count') - 1
+    )
\ No newline at end of file
@@ -27,7 +27,10 @@ load_dotenv(os.path.join(BASE_DIR, '.env'))
 SECRET_KEY = os.getenv('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.getenv('DEBUG')
+# os.getenv returns a string, and any non-empty string (even 'False') is
+# truthy - parse it so DEBUG-gated code like the media urlpatterns in
+# studybud/urls.py really is skipped in production.
+DEBUG = os.getenv('DEBUG', 'False').lower() in ('true', '1', 'yes')
 
 ALLOWED_HOSTS = ['*']
 
@@ -1,19 +1,17 @@
 from django.contrib import admin
-from django.urls import path, include, re_path
+from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.static import serve
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', include('base.urls')), 
+    path('', include('base.urls')),
     path('api/', include('base.api.urls')),
 ]
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-else:
-    # This is the crucial part for serving media files in production
-    urlpatterns += [
-        re_path(r'^images/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
-    ]
\ No newline at end of file
+# In production, media under MEDIA_URL is served by the web server
+# (e.g. an nginx `location /images/ { alias <MEDIA_ROOT>/; }` block)
+# instead of Django's static serve view, which reads each file in
+# Python and ties up a worker per request.